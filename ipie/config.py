@@ -45,3 +45,5 @@ config.add_option('use_gpu', bool(int(IPIE_USE_GPU)))
 # Memory limits should be in GB
 config.add_option('max_memory_for_wicks', 2.0)
 config.add_option('max_memory_sd_energy_gpu', 2.0)
+# Fraction of device memory the cupy memory pool may hold.
+config.add_option('gpu_memory_pool_fraction', 0.9)
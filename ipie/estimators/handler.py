@@ -5,6 +5,7 @@ from __future__ import print_function
 import copy
 import os
 import time
+import types
 import warnings
 
 import h5py
@@ -13,18 +14,19 @@ import scipy.linalg
 
 from mpi4py import MPI
 
+from ipie.config import config
 from ipie.estimators.energy import EnergyEstimator
 from ipie.estimators.estimator_base import EstimatorBase
 from ipie.estimators.utils import H5EstimatorHelper
 from ipie.utils.io import get_input_value, format_fixed_width_strings
 
-from ipie.utils.misc import is_cupy
+from ipie.utils.backend import to_host, zeros_pinned
 
 
 # Some supported (non-custom) estimators
-_predefined_estimators = {
+_predefined_estimators = types.MappingProxyType({
         'energy': EnergyEstimator,
-        }
+        })
 
 
 class EstimatorHandler(object):
@@ -82,6 +84,12 @@ class EstimatorHandler(object):
                 "buffer_size",
                 default=1000,
                 verbose=verbose)
+        # Number of blocks held in memory between writes to the output file.
+        self.stage_size = get_input_value(
+                options,
+                "stage_size",
+                default=5,
+                verbose=verbose)
         observables = get_input_value(
                 options,
                 "observables",
@@ -94,35 +102,40 @@ class EstimatorHandler(object):
         else:
             self.num_walker_props = 0
             self.walker_header = ''
+        self._fh5 = None
         self._estimators = {}
         self._shapes = []
         self._offsets = {}
-        for obs, obs_dict in observables.items():
-            try:
-                est = _predefined_estimators[obs](
-                            comm=comm,
-                            system=system,
-                            ham=hamiltonian,
-                            trial=trial,
-                            options=obs_dict,
-                            )
-                self[obs] = est
-            except KeyError:
+        self._slices = {}
+        # Running offset of the next estimator registered.
+        self._total = 0
+        for obs in observables.keys():
+            if obs not in _predefined_estimators:
                 raise RuntimeError(f"unknown observable: {obs}")
+        resolved = [
+                (obs, _predefined_estimators[obs], obs_dict)
+                for obs, obs_dict in observables.items()
+                ]
+        for obs, est_cls, obs_dict in resolved:
+            self[obs] = est_cls(
+                        comm=comm,
+                        system=system,
+                        ham=hamiltonian,
+                        trial=trial,
+                        options=obs_dict,
+                        )
         if verbose:
             print("# Finished settting up estimator object.")
 
     def __setitem__(self, name: str, estimator: EstimatorBase) -> None:
         self._estimators[name] = estimator
-        size = estimator.size
+        size = int(estimator.size)
         self._shapes.append(estimator.shape)
-        if len(self._offsets.keys()) == 0:
-            self._offsets[name] = 0
-            prev_obs = name
-        else:
-            prev_obs = list(self._offsets.keys())[-1]
-            offset = self._estimators[prev_obs].size + self._offsets[prev_obs]
-            self._offsets[name] = offset
+        self._offsets[name] = self._total
+        # Estimator data sits after the walker properties in the block buffer.
+        start = self.num_walker_props + self._total
+        self._slices[name] = slice(start, start + size)
+        self._total += size
 
     def get_offset(self, name: str) -> int:
         offset = self._offsets.get(name)
@@ -140,43 +153,107 @@ class EstimatorHandler(object):
     def size(self):
         return sum(o.size for k, o in self._estimators.items())
 
+    @property
+    def total_size(self):
+        """Size of contiguous block buffer holding walker properties and all
+        estimators."""
+        return int(self.size) + self.num_walker_props
+
     def initialize(self, comm):
-        self.local_estimates = numpy.zeros((self.size+self.num_walker_props),
-                dtype=numpy.complex128)
-        self.global_estimates = numpy.zeros((self.size+self.num_walker_props),
-                dtype=numpy.complex128)
+        # All estimators share a single contiguous buffer so each block needs
+        # only one collective irrespective of the number of estimators. The
+        # walker properties at the front of the buffer are reduced separately
+        # by print_block, as the shift is needed before the next step, so only
+        # the estimator part is reduced in place here. The walker properties
+        # and all estimator data are complex so a single complex128 buffer
+        # reduced with the C_DOUBLE_COMPLEX typemap is already homogeneous,
+        # splitting it by type would only add a collective. We double buffer
+        # so the next block can accumulate while the previous block's
+        # reduction is in flight.
+        self._buffers = [self._allocate_buffer() for i in range(2)]
+        self._ibuffer = 0
+        self.local_estimates = self._buffers[0]
+        self._pending_req = None
+        self._pending_block = None
+        self._pending_estimates = None
+        self._walker_factors = None
         header = '{:>17s}  '.format('Block')
         header +=  format_fixed_width_strings(self.walker_header)
         header += ' '
         for k, e in self.items():
             if e.print_to_stdout:
                 header += e.header_to_text
-        if comm.rank == 0:
-            with h5py.File(self.filename, "w") as fh5:
-                pass
-            self.dump_metadata()
+        # Keep the output file open for the duration of the run rather than
+        # reopening it every block. Every rank holds the reduced estimates so
+        # with parallel hdf5 available they all write rather than funnelling
+        # output through the root.
+        self._parallel_io = comm.size > 1 and h5py.get_config().mpi
+        if self._parallel_io:
+            self.filename = comm.bcast(self.filename, root=0)
+            self.json_string = comm.bcast(
+                    getattr(self, "json_string", None), root=0)
+            self._fh5 = h5py.File(
+                    self.filename,
+                    "w",
+                    driver="mpio",
+                    comm=comm,
+                    libver="latest")
+        elif comm.rank == 0:
+            self._fh5 = h5py.File(self.filename, "w", libver="latest")
         self.output = H5EstimatorHelper(self.filename,
                 base="block_size_1",
                 chunk_size=self.buffer_size,
-                shape=(self.size+self.num_walker_props,)
+                shape=(self.total_size,),
+                fh5=self._fh5,
+                comm=comm if self._parallel_io else None,
+                stage_size=self.stage_size
                 )
-        if comm.rank == 0:
-            with h5py.File(self.filename, 'r+') as fh5:
-                fh5['block_size_1/num_walker_props'] = self.num_walker_props
-                fh5['block_size_1/walker_prop_header'] = self.walker_header
-                for k, o in self.items():
-                    fh5[f'block_size_1/shape/{k}'] = o.shape
-                    fh5[f'block_size_1/size/{k}'] = o.size
-                    fh5[f'block_size_1/scalar/{k}'] = int(o.scalar_estimator)
-                    fh5[f'block_size_1/names/{k}'] = ' '.join(name for name in o.names)
-                    fh5[f'block_size_1/offset/{k}'] = self.num_walker_props + self.get_offset(k)
+        if self._fh5 is not None:
+            # Strings are stored with fixed length as parallel hdf5 can't
+            # write variable length data.
+            fh5 = self._fh5
+            self.dump_metadata()
+            self.output.create_dataset()
+            fh5['block_size_1/num_walker_props'] = self.num_walker_props
+            fh5['block_size_1/walker_prop_header'] = numpy.array(
+                    self.walker_header).astype("S")
+            for k, o in self.items():
+                fh5[f'block_size_1/shape/{k}'] = o.shape
+                fh5[f'block_size_1/size/{k}'] = o.size
+                fh5[f'block_size_1/scalar/{k}'] = int(o.scalar_estimator)
+                fh5[f'block_size_1/names/{k}'] = numpy.array(
+                        ' '.join(name for name in o.names)).astype("S")
+                fh5[f'block_size_1/offset/{k}'] = self.num_walker_props + self.get_offset(k)
+            # All objects have been created so readers can now follow the
+            # output while the calculation is running. SWMR is not available
+            # with the mpio driver.
+            if not self._parallel_io:
+                fh5.swmr_mode = True
         if comm.rank == 0:
             print(header)
 
+    def _allocate_buffer(self):
+        """Allocate host block buffer.
+
+        Estimator data is copied to the host in compute_estimators so the
+        buffer lives there and is reduced with MPI. On GPU runs it is
+        page-locked so these device to host copies are cheaper.
+        """
+        if config.get_option('use_gpu'):
+            return zeros_pinned(self.total_size, dtype=numpy.complex128)
+        else:
+            return numpy.zeros(self.total_size, dtype=numpy.complex128)
+
+    def finalise(self, comm):
+        """Write out any outstanding blocks and close output file."""
+        self.flush_block(comm)
+        if self._fh5 is not None:
+            self.output.flush()
+            self._fh5.close()
+            self._fh5 = None
 
     def dump_metadata(self):
-        with h5py.File(self.filename, "a") as fh5:
-            fh5["metadata"] = self.json_string
+        self._fh5["metadata"] = numpy.array(self.json_string).astype("S")
 
     def increment_file_number(self):
         self.index = self.index + 1
@@ -194,52 +271,86 @@ class EstimatorHandler(object):
         # Compute all estimators
         # For the moment only consider estimators compute per block.
         # TODO: generalize for different block groups (loop over groups)
-        offset = self.num_walker_props
         for k, e in self.items():
             e.compute_estimator(system, walker_batch, hamiltonian, trial)
-            start = offset + self.get_offset(k)
-            end = start + int(self[k].size)
-            self.local_estimates[start:end] += e.data
+            # Non-scalar estimators may hold their data on the device.
+            self.local_estimates[self._slices[k]] += to_host(e.data)
 
-    def print_block(self, comm, block, walker_factors, div_factor=None):
-        self.local_estimates[:walker_factors.size] = walker_factors.buffer
-        comm.Reduce(self.local_estimates, self.global_estimates, op=MPI.SUM)
+    def iallreduce(self, comm):
+        """Start summing local block estimates in place across all ranks.
+
+        Only the estimator part of the buffer is reduced, the walker
+        properties have already been reduced by print_block.
+
+        Returns
+        -------
+        req : :class:`mpi4py.MPI.Request`
+            Handle to wait on before reading the buffer.
+        """
+        estimates = self.local_estimates[self.num_walker_props:]
+        return comm.Iallreduce(
+                MPI.IN_PLACE,
+                [estimates, MPI.C_DOUBLE_COMPLEX],
+                op=MPI.SUM)
+
+    def wait(self):
+        """Wait for the outstanding block reduction to complete."""
+        if self._pending_req is None:
+            return
+        self._pending_req.Wait()
+        self._pending_req = None
+
+    def flush_block(self, comm):
+        """Wait for the previous block's reduction and write it out."""
+        if self._pending_estimates is None:
+            return
+        self.wait()
+        block = self._pending_block
+        walker_factors = self._walker_factors
+        estimates = self._pending_estimates
         output_string = ' '
-        # Get walker data.
+        # Walker data was already reduced and normalised in print_block.
         offset = walker_factors.size
-        if comm.rank == 0:
-            walker_factors.post_reduce_hook(self.global_estimates[:offset], block)
-        output_string += walker_factors.to_text(self.global_estimates[:offset])
+        output_string += walker_factors.to_text(estimates[:offset])
         output_string += ' '
         for k, e in self.items():
+            est_data = estimates[self._slices[k]]
+            e.post_reduce_hook(est_data)
             if comm.rank == 0:
-                start = offset + self.get_offset(k)
-                end = start + int(self[k].size)
-                est_data = self.global_estimates[start:end]
-                e.post_reduce_hook(est_data)
                 est_string = e.data_to_text(est_data)
                 e.to_ascii_file(est_string)
                 if e.print_to_stdout:
                     output_string += est_string
-        if comm.rank == 0:
-            shift = (
-                    self.global_estimates[walker_factors.get_index('HybridEnergy')]
-                    )
-
-        else:
-            shift = None
-        walker_factors.eshift = comm.bcast(shift)
-        if comm.rank == 0:
-            self.output.push_to_chunk(
-                    self.global_estimates,
-                    f"data")
+        if self._fh5 is not None:
+            self.output.push_to_chunk(estimates)
             self.output.increment()
         if comm.rank == 0:
             print(f"{block:>17d} " + output_string)
+        self._pending_estimates = None
+
+    def print_block(self, comm, block, walker_factors, div_factor=None):
+        # The shift is needed straight away for the next propagation step so
+        # reduce the handful of walker properties with a blocking call. Every
+        # rank holds the result so there is no need to broadcast from the root.
+        walker_data = walker_factors.buffer.copy()
+        comm.Allreduce(MPI.IN_PLACE, walker_data, op=MPI.SUM)
+        walker_factors.post_reduce_hook(walker_data, block)
+        walker_factors.eshift = (
+                walker_data[walker_factors.get_index('HybridEnergy')]
+                )
+        # Output for the previous block is written while this block's
+        # reduction overlaps with the next block's propagation.
+        self.flush_block(comm)
+        self.local_estimates[:walker_factors.size] = walker_data
+        self._pending_req = self.iallreduce(comm)
+        self._pending_block = block
+        self._pending_estimates = self.local_estimates
+        self._walker_factors = walker_factors
+        self._ibuffer = 1 - self._ibuffer
+        self.local_estimates = self._buffers[self._ibuffer]
         self.zero()
 
     def zero(self):
-        self.local_estimates[:] = 0.0
-        self.global_estimates[:] = 0.0
+        self.local_estimates.fill(0.0)
         for k, e in self.items():
             e.zero()
@@ -9,6 +9,7 @@ from ipie.estimators.kernels import exchange_reduction
 
 from ipie.utils.backend import arraylib as xp
 from ipie.utils.backend import to_host, synchronize
+from ipie.utils.gpu_pool import free_scratch, get_scratch
 
 # Local energy routies for chunked (distributed) integrals. Distributed here
 # means over MPI processes with information typically residing on different
@@ -271,8 +272,14 @@ def local_energy_single_det_uhf_batch_chunked_gpu(
     num_chunks = max(1, ceil(mem_needed / max_mem))
     chunk_size = ceil(max_nchol / num_chunks)
     nchol_chunks = ceil(max_nchol / chunk_size)
-    buff = xp.zeros(shape=(chunk_size, nwalkers * max_nocc * max_nocc),
-            dtype=numpy.complex128)
+    buff_shape = (chunk_size, nwalkers * max_nocc * max_nocc)
+    if num_chunks == 1:
+        # Fully overwritten by the exchange kernel so reuse between calls.
+        buff = get_scratch(buff_shape, numpy.complex128)
+    else:
+        # Memory limited so don't keep a full size workspace cached.
+        free_scratch(numpy.complex128)
+        buff = xp.empty(buff_shape, dtype=numpy.complex128)
 
     Ghalfa = Ghalfa.reshape(nwalkers, nalpha * nbasis)
     Ghalfb = Ghalfb.reshape(nwalkers, nbeta * nbasis)
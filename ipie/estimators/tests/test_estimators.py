@@ -1,11 +1,15 @@
 import os
 
+import h5py
 import numpy as np
 import pytest
 
+from ipie.analysis.extraction import extract_observable
 from ipie.estimators.energy import EnergyEstimator
 from ipie.estimators.handler import EstimatorHandler
+from ipie.estimators.utils import H5EstimatorHelper
 from ipie.utils.testing import gen_random_test_instances
+from ipie.walkers.walker_batch_handler import WalkerAccumulator
 
 @pytest.mark.unit
 def test_energy_estimator():
@@ -40,17 +44,165 @@ def test_estimator_handler():
     estim.print_to_stdout = False
     from mpi4py import MPI
     comm = MPI.COMM_WORLD
-    options = {'block_size': 10, 'observables': {'energy': {'filename': 'test2.txt'}}}
+    options = {'block_size': 10, 'stage_size': 2,
+            'observables': {'energy': {'filename': 'test2.txt'}}}
     handler = EstimatorHandler(comm, system, ham, trial, options=options)
+    assert handler.stage_size == 2
     handler["energy1"] = estim
+    assert handler.total_size == 10
+    assert handler.get_offset("energy1") == 5
     handler.json_string = ''
     handler.initialize(comm)
     handler.compute_estimators(comm, system, ham, trial, walker_batch)
     handler.compute_estimators(comm, system, ham, trial, walker_batch)
+    handler.finalise(comm)
+
+@pytest.mark.unit
+def test_estimator_handler_print_block():
+    nmo = 10
+    nocc = 8
+    naux = 30
+    nwalker = 10
+    system, ham, walker_batch, trial = gen_random_test_instances(nmo, nocc, naux, nwalker)
+    from mpi4py import MPI
+    comm = MPI.COMM_WORLD
+    walker_state = WalkerAccumulator(["Weight", "WeightFactor", "HybridEnergy"], 10)
+    options = {'observables': {'energy': {}}}
+    handler = EstimatorHandler(comm, system, ham, trial,
+            walker_state=walker_state, options=options)
+    handler.json_string = ''
+    handler.initialize(comm)
+    # Rows are written by every rank when parallel hdf5 is available.
+    assert handler._parallel_io == (comm.size > 1 and h5py.get_config().mpi)
+    estim = handler['energy']
+    expected = []
+    for block in [1, 2]:
+        if block == 2:
+            # Make the second block distinguishable from the first. All
+            # walkers start out with the same local energy so reweighting
+            # alone would leave ETotal unchanged.
+            rng = np.random.default_rng(7)
+            walker_batch.phia[0] += 0.1 * rng.random(walker_batch.phia[0].shape)
+            walker_batch.phib[0] += 0.1 * rng.random(walker_batch.phib[0].shape)
+            walker_batch.weight[0] *= 3.0
+            walker_batch.hybrid_energy += 1.0
+        handler.compute_estimators(comm, system, ham, trial, walker_batch)
+        walker_state.update(walker_batch)
+        walker_data = comm.allreduce(walker_state.buffer.copy())
+        walker_state.post_reduce_hook(walker_data, block)
+        est_data = comm.allreduce(estim.data.copy())
+        estim.post_reduce_hook(est_data)
+        expected.append((
+            walker_data[walker_state.get_index('HybridEnergy')],
+            est_data[estim.get_index('ETotal')]))
+        reduced = handler.local_estimates
+        handler.print_block(comm, block, walker_state)
+        # shift is available on every rank without a broadcast.
+        assert walker_state.eshift == pytest.approx(expected[-1][0].real)
+        # accumulate into the other buffer while this block is reduced.
+        assert handler.local_estimates is not reduced
+        assert handler._pending_estimates is reduced
+        assert np.all(handler.local_estimates == 0.0)
+        walker_state.zero()
+    assert expected[0][0] != pytest.approx(expected[1][0])
+    assert expected[0][1] != pytest.approx(expected[1][1])
+    # block output is only written once the reduction has been waited on.
+    handler.finalise(comm)
+    if comm.rank == 0:
+        data = extract_observable(handler.filename, 'energy')
+        assert len(data) == 2
+        for i, (ehyb, etot) in enumerate(expected):
+            assert data.HybridEnergy.values[i] == pytest.approx(ehyb)
+            assert data.ETotal.values[i] == pytest.approx(etot)
+
+@pytest.mark.unit
+def test_estimator_handler_unknown_observable():
+    nmo = 10
+    nocc = 8
+    naux = 30
+    nwalker = 10
+    system, ham, walker_batch, trial = gen_random_test_instances(nmo, nocc, naux, nwalker)
+    from mpi4py import MPI
+    comm = MPI.COMM_WORLD
+    options = {'observables': {'energy': {}, 'not_an_observable': {}}}
+    with pytest.raises(RuntimeError):
+        EstimatorHandler(comm, system, ham, trial, options=options)
+
+@pytest.mark.unit
+def test_h5_helper_staged_writes():
+    from mpi4py import MPI
+    comm = MPI.COMM_WORLD
+    if comm.rank != 0:
+        return
+    with h5py.File("staged.h5", "w") as fh5:
+        output = H5EstimatorHelper(
+                "staged.h5",
+                base="block_size_1",
+                chunk_size=10,
+                shape=(2,),
+                fh5=fh5,
+                stage_size=3)
+        output.create_dataset()
+        dset = fh5["block_size_1/data/000000000"]
+        for i in range(4):
+            output.push_to_chunk(np.array([i, i+1]))
+            output.increment()
+            if i < 2:
+                assert dset.shape == (0, 2)
+        assert dset.shape == (3, 2)
+        output.flush()
+        assert dset.shape == (4, 2)
+        assert fh5["block_size_1/max_block/000000000"][()] == 3
+        assert dset[3, 1] == pytest.approx(4.0)
+
+@pytest.mark.unit
+@pytest.mark.skipif(not h5py.get_config().mpi, reason="h5py built without MPI")
+def test_h5_helper_parallel_writes():
+    from mpi4py import MPI
+    comm = MPI.COMM_WORLD
+    # More rows than some flushes so ranks without any rows are exercised.
+    rows = np.arange(7*3, dtype=np.complex128).reshape((7, 3)) * (1 + 1j)
+    with h5py.File("staged_mpio.h5", "w", driver="mpio", comm=comm) as fh5:
+        output = H5EstimatorHelper(
+                "staged_mpio.h5",
+                base="block_size_1",
+                chunk_size=10,
+                shape=(3,),
+                fh5=fh5,
+                comm=comm,
+                stage_size=4)
+        output.create_dataset()
+        for row in rows:
+            output.push_to_chunk(row)
+            output.increment()
+        output.flush()
+    if comm.rank == 0:
+        with h5py.File("staged.h5", "w") as fh5:
+            output = H5EstimatorHelper(
+                    "staged.h5",
+                    base="block_size_1",
+                    chunk_size=10,
+                    shape=(3,),
+                    fh5=fh5,
+                    stage_size=4)
+            output.create_dataset()
+            for row in rows:
+                output.push_to_chunk(row)
+                output.increment()
+            output.flush()
+        serial = h5py.File("staged.h5", "r")
+        parallel = h5py.File("staged_mpio.h5", "r")
+        for name in ["data", "max_block"]:
+            dset = f"block_size_1/{name}/000000000"
+            assert np.array_equal(serial[dset][()], parallel[dset][()])
+        assert parallel["block_size_1/data/000000000"].shape == (7, 3)
+        serial.close()
+        parallel.close()
+    comm.Barrier()
 
 def teardown_module():
     cwd = os.getcwd()
-    files = ["estimates.0.h5", "test.txt", "test2.txt"]
+    files = ["estimates.0.h5", "staged.h5", "staged_mpio.h5", "test.txt", "test2.txt"]
     for f in files:
         try:
             os.remove(cwd + "/" + f)
@@ -17,7 +17,7 @@ from ipie.propagation.overlap import calc_overlap_single_det_batch
 from ipie.systems.generic import Generic
 from ipie.trial_wavefunction.multi_slater import MultiSlater
 from ipie.utils.misc import dotdict
-from ipie.utils.pack import pack_cholesky
+from ipie.utils.pack_numba import pack_cholesky
 from ipie.utils.testing import (generate_hamiltonian, get_random_nomsd,
                                 get_random_phmsd)
 from ipie.walkers.multi_det_batch import MultiDetTrialWalkerBatch
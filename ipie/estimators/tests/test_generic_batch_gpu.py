@@ -20,7 +20,7 @@ from ipie.propagation.force_bias import construct_force_bias_batch
 from ipie.systems.generic import Generic
 from ipie.trial_wavefunction.multi_slater import MultiSlater
 from ipie.utils.misc import dotdict
-from ipie.utils.pack import pack_cholesky
+from ipie.utils.pack_numba import pack_cholesky
 from ipie.utils.testing import (generate_hamiltonian, get_random_nomsd,
                                 get_random_phmsd, shaped_normal)
 from ipie.walkers.multi_det_batch import MultiDetTrialWalkerBatch
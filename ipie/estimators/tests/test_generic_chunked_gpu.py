@@ -21,8 +21,9 @@ from ipie.propagation.continuous import Continuous
 from ipie.systems.generic import Generic
 from ipie.trial_wavefunction.multi_slater import MultiSlater
 from ipie.utils.misc import dotdict, is_cupy
-from ipie.utils.mpi import MPIHandler, get_shared_array, have_shared_mem
-from ipie.utils.pack import pack_cholesky
+from ipie.utils.mpi import (bcast_shared_array, get_leader_comm,
+                            get_mpi_handler, get_shared_array,
+                            get_shared_comm, have_shared_mem)
 from ipie.utils.testing import generate_hamiltonian, get_random_nomsd
 from ipie.walkers.single_det_batch import SingleDetWalkerBatch
 
@@ -45,29 +46,36 @@ def test_generic_chunked_gpu():
     nelec = (4, 2)
     h1e, chol, enuc, eri = generate_hamiltonian(nmo, nelec, cplx=False)
 
-    h1e = comm.bcast(h1e)
-    chol = comm.bcast(chol)
-    enuc = comm.bcast(enuc)
-    eri = comm.bcast(eri)
-
-    chol = chol.reshape((-1, nmo * nmo)).T.copy()
+    # (nchol, nmo, nmo) -> (nmo, nmo, nchol) with a single copy.
+    nchol = chol.shape[0]
+    chol = chol.transpose((1, 2, 0)).copy()
 
-    nchol = chol.shape[-1]
-    chol = chol.reshape((nmo, nmo, nchol))
+    # Keep a single copy of the integrals per node.
+    shared_comm = get_shared_comm(comm)
+    leader_comm = get_leader_comm(comm, shared_comm)
+    h1e = bcast_shared_array(comm, shared_comm, h1e, leader_comm)
+    chol = bcast_shared_array(comm, shared_comm, chol, leader_comm)
+    enuc = comm.bcast(enuc)
+    eri = bcast_shared_array(comm, shared_comm, eri, leader_comm)
+    if leader_comm != MPI.COMM_NULL:
+        leader_comm.Free()
 
     idx = numpy.triu_indices(nmo)
     cp_shape = (nmo * (nmo + 1) // 2, chol.shape[-1])
     # chol_packed = numpy.zeros(cp_shape, dtype = chol.dtype)
-    chol_packed = get_shared_array(comm, cp_shape, chol.dtype)
-
-    if comm.rank == 0:
-        pack_cholesky(idx[0], idx[1], chol_packed, chol)
+    chol_packed = get_shared_array(shared_comm, cp_shape, chol.dtype)
 
-    chol = chol.reshape((nmo * nmo, nchol))
+    if shared_comm.rank == 0:
+        chol_packed[:] = chol[idx[0], idx[1], :]
+    shared_comm.Barrier()
 
     system = Generic(nelec=nelec)
     ham = HamGeneric(
-        h1e=numpy.array([h1e, h1e]), chol=chol, chol_packed=chol_packed, ecore=enuc
+        h1e=numpy.broadcast_to(h1e[None, :, :], (2,) + h1e.shape),
+        chol=chol.reshape((nmo * nmo, nchol)),
+        chol_packed=chol_packed,
+        ecore=enuc,
+        copy_h1e=False,
     )
     wfn = get_random_nomsd(system.nup, system.ndown, ham.nbasis, ndet=1, cplx=False)
     trial = MultiSlater(system, ham, wfn)
@@ -82,7 +90,7 @@ def test_generic_chunked_gpu():
     options = {"hybrid": True}
     prop = Continuous(system, ham, trial, qmc, options=options)
 
-    mpi_handler = MPIHandler(comm, options={"nmembers": 2}, verbose=(rank == 0))
+    mpi_handler = get_mpi_handler(comm, nmembers=2, verbose=(rank == 0))
     if comm.rank == 0:
         print("# Chunking hamiltonian.")
     ham.chunk(mpi_handler)
@@ -104,8 +112,6 @@ def test_generic_chunked_gpu():
         prop.propagate_walker_batch(walker_batch, system, ham, trial, trial.energy)
         walker_batch.reortho()
 
-    trial._rchola = cupy.asarray(trial._rchola)
-    trial._rcholb = cupy.asarray(trial._rcholb)
     energies_einsum = local_energy_single_det_batch_gpu(
         system, ham, walker_batch, trial
     )
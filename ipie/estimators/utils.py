@@ -6,27 +6,37 @@ import scipy
 class H5EstimatorHelper(object):
     """Helper class for pushing data to hdf5 dataset of fixed length.
 
+    push_to_chunk appends to a single resizable dataset, base/data, with the
+    last row written recorded in base/max_block.
+
     Parameters
     ----------
-    h5f : :class:`h5py.File`
-        Output file object.
-    name : string
-        Dataset name.
+    filename : string
+        Output file name.
+    base : string
+        Base group name.
+    chunk_size : int
+        Number of rows per hdf5 chunk.
     shape : tuple
         Shape of output data.
-    dtype : type
-        Output data type.
+    fh5 : :class:`h5py.File`
+        Open file object used by push_to_chunk. Optional.
+    comm : :class:`mpi4py.MPI.Comm`
+        Communicator the file was opened with if using the mpio driver, in
+        which case each rank collectively writes a contiguous share of the
+        staged rows. Optional.
+    stage_size : int
+        Number of rows push_to_chunk stages in memory before writing them out
+        together. Optional. Default 1.
 
     Attributes
     ----------
-    store : :class:`h5py.File.DataSet`
-        Dataset object.
     index : int
         Counter for incrementing data.
     """
 
-    def __init__(self, filename, base, chunk_size=1, shape=(1,)):
-        # self.store = h5f.create_dataset(name, shape, dtype=dtype)
+    def __init__(self, filename, base, chunk_size=1, shape=(1,), fh5=None,
+                 comm=None, stage_size=1):
         self.filename = filename
         self.base = base
         self.index = 0
@@ -34,6 +44,43 @@ class H5EstimatorHelper(object):
         self.nzero = 9
         self.chunk_size = chunk_size
         self.shape = (chunk_size,) + shape
+        self.stage_size = stage_size
+        self._fh5 = fh5
+        self._dset = None
+        self._max_block = None
+        self._staging = None
+        self._nstaged = 0
+        self._comm = comm
+        if comm is not None:
+            self._dxpl = h5py.h5p.create(h5py.h5p.DATASET_XFER)
+            self._dxpl.set_dxpl_mpio(h5py.h5fd.MPIO_COLLECTIVE)
+
+    def create_dataset(self, dtype=numpy.complex128):
+        """Create resizable chunked dataset which push_to_chunk appends to.
+
+        Needs to be called once before the file is switched to SWMR mode as no
+        new objects can be created afterwards.
+
+        Parameters
+        ----------
+        dtype : type
+            Output data type.
+        """
+        assert self._dset is None, "Dataset already created."
+        padded = "0" * self.nzero
+        self._dset = self._fh5.create_dataset(
+                self.base + f"/data/{padded}",
+                shape=(0,) + self.shape[1:],
+                maxshape=(None,) + self.shape[1:],
+                chunks=self.shape,
+                dtype=dtype)
+        self._staging = numpy.zeros(
+                (self.stage_size,) + self.shape[1:],
+                dtype=dtype)
+        self._nstaged = 0
+        self._max_block = self._fh5.create_dataset(
+                self.base + f"/max_block/{padded}",
+                data=-1)
 
     def push(self, data, name):
         """Push data to dataset.
@@ -50,26 +97,60 @@ class H5EstimatorHelper(object):
         with h5py.File(self.filename, "a") as fh5:
             fh5[dset] = data
 
-    def push_to_chunk(self, data, name):
-        """Push data to dataset.
+    def push_to_chunk(self, data):
+        """Append data to resizable dataset created by create_dataset.
+
+        Rows are staged in memory and written stage_size at a time, call
+        flush to write out any remaining rows.
 
         Parameters
         ----------
         data : :class:`numpy.ndarray`
             Data to push.
         """
-        ix = str(self.index // self.chunk_size)
-        # To ensure string indices are sorted properly.
-        padded = "0" * (self.nzero - len(ix)) + ix
-        dset = self.base + "/" + name + "/" + padded
-        with h5py.File(self.filename, "a") as fh5:
-            if dset in fh5:
-                fh5[dset][self.chunk_index] = data
-                fh5[self.base+f'/max_block/{ix}'][()] = self.chunk_index
-            else:
-                fh5[dset] = numpy.zeros(self.shape, dtype=numpy.complex128)
-                fh5[dset][self.chunk_index] = data
-                fh5[self.base+f'/max_block/{ix}'] = self.chunk_index
+        self._staging[self._nstaged] = data
+        self._nstaged += 1
+        if self._nstaged == self.stage_size:
+            self.flush()
+
+    def flush(self):
+        """Write staged rows to file."""
+        nstaged = self._nstaged
+        if nstaged == 0:
+            return
+        dset = self._dset
+        start = dset.shape[0]
+        rows = slice(start, start + nstaged)
+        dset.resize(start + nstaged, axis=0)
+        if self._comm is None:
+            dset[rows] = self._staging[:nstaged]
+        else:
+            self._write_collective(start, nstaged)
+        self._nstaged = 0
+        self._max_block[()] = start + nstaged - 1
+        self._fh5.flush()
+
+    def _write_collective(self, start, nstaged):
+        """Write this rank's contiguous share of the staged rows.
+
+        Ranks without any rows still take part in the collective write with
+        an empty selection, h5py's high level interface would skip the write
+        altogether leaving the remaining ranks waiting.
+        """
+        comm = self._comm
+        lo = (comm.rank * nstaged) // comm.size
+        hi = ((comm.rank + 1) * nstaged) // comm.size
+        mspace = h5py.h5s.create_simple(self._staging.shape)
+        fspace = self._dset.id.get_space()
+        if hi > lo:
+            count = (hi - lo,) + self.shape[1:]
+            offset = (0,) * len(self.shape[1:])
+            mspace.select_hyperslab((lo,) + offset, count)
+            fspace.select_hyperslab((start + lo,) + offset, count)
+        else:
+            mspace.select_none()
+            fspace.select_none()
+        self._dset.id.write(mspace, fspace, self._staging, dxpl=self._dxpl)
 
     def increment(self):
         self.index = self.index + 1
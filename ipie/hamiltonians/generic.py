@@ -38,6 +38,9 @@ class Generic(object):
         format.
     verbose : bool
         Print extra information.
+    copy_h1e : bool
+        Store a copy of h1e. If False h1e is used as is, e.g. a read-only
+        broadcast view, and must not be modified. Optional. Default True.
 
     Attributes
     ----------
@@ -71,6 +74,7 @@ class Generic(object):
         options={},
         verbose=False,
         write_ints=False,
+        copy_h1e=True,
     ):
         if verbose:
             print("# Parsing input options for hamiltonians.Generic.")
@@ -130,7 +134,10 @@ class Generic(object):
                 print("# Found complex Cholesky integrals.")
             self.cplx_chol = True
 
-        self.H1 = array(h1e)
+        if copy_h1e:
+            self.H1 = array(h1e)
+        else:
+            self.H1 = h1e
         self.nbasis = h1e.shape[-1]
 
         mem = self.chol_vecs.nbytes / (1024.0**3)
@@ -1,13 +1,14 @@
 import sys
 import time
 
+import numba
 import numpy
 
 from ipie.hamiltonians.generic import (Generic, construct_h1e_mod,
                                        read_integrals)
 from ipie.utils.io import get_input_value
-from ipie.utils.mpi import get_shared_array, have_shared_mem
-from ipie.utils.pack import pack_cholesky
+from ipie.utils.mpi import get_shared_array, get_shared_comm, have_shared_mem
+from ipie.utils.pack_numba import pack_cholesky
 
 
 def get_hamiltonian(system, ham_opts=None, verbose=0, comm=None):
@@ -46,6 +47,14 @@ def get_hamiltonian(system, ham_opts=None, verbose=0, comm=None):
 
         chol = chol.reshape((nbsf, nbsf, nchol))
 
+        # numba starts a thread per core in every rank so split the node's
+        # cores between its ranks while packing.
+        nthreads = numba.get_num_threads()
+        shared_comm = get_shared_comm(comm)
+        if shared_comm is not None:
+            numba.set_num_threads(max(1, nthreads // shared_comm.size))
+            shared_comm.Free()
+
         shmem = have_shared_mem(comm)
         pack_chol = get_input_value(
             ham_opts, "symmetry", default=True, verbose=verbose, alias=["pack_cholesky"]
@@ -70,6 +79,7 @@ def get_hamiltonian(system, ham_opts=None, verbose=0, comm=None):
             chol_packed = numpy.zeros(cp_shape, dtype=dtype)
             if pack_chol:
                 pack_cholesky(idx[0], idx[1], chol_packed, chol)
+        numba.set_num_threads(nthreads)
 
         chol = chol.reshape((nbsf * nbsf, nchol))
 
@@ -16,8 +16,8 @@ from ipie.propagation.force_bias import (
 from ipie.systems.generic import Generic
 from ipie.trial_wavefunction.multi_slater import MultiSlater
 from ipie.utils.misc import dotdict, is_cupy
-from ipie.utils.mpi import MPIHandler, get_shared_array, have_shared_mem
-from ipie.utils.pack import pack_cholesky
+from ipie.utils.mpi import bcast_array, get_mpi_handler, get_shared_array, have_shared_mem
+from ipie.utils.pack_numba import pack_cholesky
 from ipie.utils.testing import generate_hamiltonian, get_random_nomsd
 from ipie.walkers.single_det_batch import SingleDetWalkerBatch
 
@@ -39,10 +39,10 @@ def test_generic_propagation_chunked():
     nelec = (4, 2)
     h1e, chol, enuc, eri = generate_hamiltonian(nmo, nelec, cplx=False)
 
-    h1e = comm.bcast(h1e)
-    chol = comm.bcast(chol)
+    h1e = bcast_array(comm, h1e)
+    chol = bcast_array(comm, chol)
     enuc = comm.bcast(enuc)
-    eri = comm.bcast(eri)
+    eri = bcast_array(comm, eri)
 
     chol = chol.reshape((-1, nmo * nmo)).T.copy()
 
@@ -76,7 +76,7 @@ def test_generic_propagation_chunked():
     options = {"hybrid": True}
     prop = Continuous(system, ham, trial, qmc, options=options)
 
-    mpi_handler = MPIHandler(comm, options={"nmembers": 3}, verbose=(rank == 0))
+    mpi_handler = get_mpi_handler(comm, nmembers=3, verbose=(rank == 0))
     ham.chunk(mpi_handler)
     trial.chunk(mpi_handler)
 
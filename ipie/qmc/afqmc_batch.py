@@ -23,9 +23,10 @@ from ipie.trial_wavefunction.utils import get_trial_wavefunction
 from ipie.utils.io import get_input_value, serialise, to_json
 from ipie.utils.misc import (get_git_info, print_env_info,
                              is_cupy)
-from ipie.utils.mpi import MPIHandler
+from ipie.utils.mpi import get_mpi_handler
 from ipie.utils.backend import arraylib as xp
 from ipie.utils.backend import get_host_memory, synchronize
+from ipie.utils.gpu_pool import free_scratch
 from ipie.walkers.walker_batch_handler import WalkerBatchHandler
 
 
@@ -133,7 +134,9 @@ class AFQMCBatch(object):
             verbose=self.verbosity > 1,
         )
 
-        self.mpi_handler = MPIHandler(comm, qmc_opt, verbose=verbose)
+        self.mpi_handler = get_mpi_handler(
+            comm, qmc_opt.get("nmembers", 1), verbose=verbose
+        )
         self.shared_comm = self.mpi_handler.shared_comm
         # 2. Calculation objects.
         if system is not None:
@@ -168,6 +171,12 @@ class AFQMCBatch(object):
             ngpus = xp.cuda.runtime.getDeviceCount()
             props = xp.cuda.runtime.getDeviceProperties(0)
             xp.cuda.runtime.setDevice(self.shared_comm.rank)
+            # Cap the memory pool so transient tensors are recycled from the
+            # pool rather than fragmenting the device memory.
+            mempool = xp.get_default_memory_pool()
+            mempool.set_limit(
+                    fraction=config.get_option('gpu_memory_pool_fraction')
+                    )
             if comm.rank == 0:
                 if ngpus > comm.size:
                     print(
@@ -438,6 +447,7 @@ class AFQMCBatch(object):
                 eshift += self.psi.accumulator_factors.eshift - eshift
             synchronize()
             self.tstep += time.time() - start_step
+        self.estimators.finalise(comm)
 
     def finalise(self, verbose=False):
         """Tidy up.
@@ -447,6 +457,10 @@ class AFQMCBatch(object):
         verbose : bool
             If true print out some information to stdout.
         """
+        if config.get_option('use_gpu'):
+            free_scratch()
+            xp.get_default_memory_pool().free_all_blocks()
+            xp.get_default_pinned_memory_pool().free_all_blocks()
         nsteps = max(self.qmc.nsteps, 1)
         nblocks = max(self.qmc.nblocks, 1)
         nstblz = max(nsteps // self.qmc.nstblz, 1)
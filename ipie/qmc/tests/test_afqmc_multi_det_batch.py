@@ -14,7 +14,6 @@ from ipie.qmc.afqmc_batch import AFQMCBatch
 from ipie.qmc.calc import setup_calculation
 from ipie.systems.generic import Generic
 from ipie.trial_wavefunction.multi_slater import MultiSlater
-from ipie.utils.pack import pack_cholesky
 from ipie.utils.testing import generate_hamiltonian, get_random_phmsd
 
 steps = 25
@@ -55,20 +54,22 @@ def test_generic_multi_det_batch():
     }
     numpy.random.seed(seed)
     h1e, chol, enuc, eri = generate_hamiltonian(nmo, nelec, cplx=False)
-    chol = chol.reshape((-1, nmo * nmo)).T.copy()
-
-    nchol = chol.shape[-1]
-    chol = chol.reshape((nmo, nmo, nchol))
+    # (nchol, nmo, nmo) -> (nmo, nmo, nchol) with a single copy.
+    nchol = chol.shape[0]
+    chol = chol.transpose((1, 2, 0)).copy()
 
     idx = numpy.triu_indices(nmo)
     cp_shape = (nmo * (nmo + 1) // 2, chol.shape[-1])
     chol_packed = numpy.zeros(cp_shape, dtype=chol.dtype)
-    pack_cholesky(idx[0], idx[1], chol_packed, chol)
-    chol = chol.reshape((nmo * nmo, nchol))
+    chol_packed[:] = chol[idx[0], idx[1], :]
 
     sys = Generic(nelec=nelec)
     ham = HamGeneric(
-        h1e=numpy.array([h1e, h1e]), chol=chol, chol_packed=chol_packed, ecore=enuc
+        h1e=numpy.broadcast_to(h1e[None, :, :], (2,) + h1e.shape),
+        chol=chol.reshape((nmo * nmo, nchol)),
+        chol_packed=chol_packed,
+        ecore=enuc,
+        copy_h1e=False,
     )
 
     wfn, init = get_random_phmsd(sys.nup, sys.ndown, ham.nbasis, ndet=ndets, init=True)
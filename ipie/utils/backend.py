@@ -29,6 +29,20 @@ def get_gpu_free_memory():
     used_bytes = total_bytes - free_bytes
     return used_bytes, total_bytes
 
+def zeros_pinned(shape, dtype):
+    """Allocate zeroed host array backed by page-locked memory.
+
+    Falls back to pageable memory if cupy is not available.
+    """
+    if not _have_cupy:
+        return _np.zeros(shape, dtype=dtype)
+    size = int(_np.prod(shape))
+    nbytes = size * _np.dtype(dtype).itemsize
+    mem = _cp.cuda.alloc_pinned_memory(nbytes)
+    array = _np.frombuffer(mem, dtype, size).reshape(shape)
+    array.fill(0)
+    return array
+
 def synchronize_cpu():
     pass
 
@@ -60,7 +74,7 @@ def cast_to_device(self, verbose=False):
     for k, v in self.__dict__.items():
         if isinstance(v, _np.ndarray):
             size += v.size
-        elif isinstance(v, list) and isinstance(v[0], _np.ndarray):
+        elif isinstance(v, list) and len(v) > 0 and isinstance(v[0], _np.ndarray):
             size += sum(vi.size for vi in v)
     if verbose:
         expected_bytes = size * 16.0
@@ -72,7 +86,7 @@ def cast_to_device(self, verbose=False):
     for k, v in self.__dict__.items():
         if isinstance(v, _np.ndarray):
             self.__dict__[k] = arraylib.array(v)
-        elif isinstance(v, list) and isinstance(v[0], _np.ndarray):
+        elif isinstance(v, list) and len(v) > 0 and isinstance(v[0], _np.ndarray):
             self.__dict__[k] = [arraylib.array(vi) for vi in v]
 
     used_bytes, total_bytes = get_device_memory()
@@ -0,0 +1,53 @@
+"""Reusable scratch buffers for device kernels."""
+import numpy
+
+from ipie.utils.backend import arraylib as xp
+
+# One flat buffer per dtype which is grown as required.
+_pool = {}
+
+
+def get_scratch(shape, dtype):
+    """Get uninitialised scratch array.
+
+    A single buffer is cached per dtype and requests are served by slicing
+    it, so repeated calls reuse the same allocation rather than going through
+    the device allocator. The buffer is only reallocated if a larger array is
+    requested. Callers should not hold two scratch arrays of the same dtype at
+    once.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of array.
+    dtype : type
+        Array data type.
+
+    Returns
+    -------
+    buff : :class:`numpy.ndarray` / :class:`cupy.ndarray`
+        Scratch array. Contents are undefined.
+    """
+    key = numpy.dtype(dtype).str
+    size = int(numpy.prod(shape))
+    buff = _pool.get(key)
+    if buff is None or buff.size < size:
+        # Drop the old buffer first so both are never held at once.
+        _pool.pop(key, None)
+        buff = xp.empty(size, dtype=dtype)
+        _pool[key] = buff
+    return buff[:size].reshape(shape)
+
+
+def free_scratch(dtype=None):
+    """Release cached scratch arrays.
+
+    Parameters
+    ----------
+    dtype : type
+        Only release the buffer for this data type. Default: release all.
+    """
+    if dtype is None:
+        _pool.clear()
+    else:
+        _pool.pop(numpy.dtype(dtype).str, None)
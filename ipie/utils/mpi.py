@@ -1,4 +1,6 @@
 """MPI Helper functions."""
+import weakref
+
 import numpy
 from mpi4py import MPI
 
@@ -76,6 +78,150 @@ class MPIHandler(object):
         return self.scomm.allreduce(array, op=MPI.SUM)
 
 
+# Handlers in use keyed by (communicator handle, nmembers). Entries are
+# dropped once nothing else references the handler.
+_handler_cache = weakref.WeakValueDictionary()
+
+
+def get_mpi_handler(comm, nmembers=1, verbose=False):
+    """Get MPIHandler for communicator, reusing an existing one if possible.
+
+    Building a handler splits the communicator so reusing one still in use
+    avoids creating new communicators for every calculation.
+
+    Parameters
+    ----------
+    comm : `mpi4py.MPI.Comm`
+        Global MPI communicator.
+    nmembers : int
+        Number of members in each group.
+    verbose : bool
+        Print group information if a new handler is constructed.
+
+    Returns
+    -------
+    handler : :class:`MPIHandler`
+        MPI handler.
+    """
+    key = (comm.py2f(), nmembers)
+    handler = _handler_cache.get(key)
+    # Handles are reused by MPI once a communicator is freed so check the
+    # cached handler was actually built for this communicator.
+    if (
+        handler is None
+        or handler.comm == MPI.COMM_NULL
+        or MPI.Comm.Compare(handler.comm, comm) != MPI.IDENT
+    ):
+        handler = MPIHandler(comm, options={"nmembers": nmembers}, verbose=verbose)
+        _handler_cache[key] = handler
+    return handler
+
+
+def bcast_array(comm, array, root=0):
+    """Broadcast numpy array from root using buffer based Bcast.
+
+    Only the shape and dtype are sent as python objects which avoids
+    pickling the array data itself. The data is sent with the MPI datatype
+    matching its dtype rather than as bytes so the element count stays well
+    below the int limit for large arrays.
+
+    Parameters
+    ----------
+    comm : `mpi4py.MPI.Comm`
+        MPI communicator.
+    array : :class:`numpy.ndarray`
+        Array to broadcast. Only referenced on root.
+    root : int
+        Rank to broadcast from.
+
+    Returns
+    -------
+    array : :class:`numpy.ndarray`
+        Broadcast array.
+    """
+    if comm.rank == root:
+        array = numpy.ascontiguousarray(array)
+        meta = (array.shape, array.dtype.str)
+    else:
+        meta = None
+    shape, dtype = comm.bcast(meta, root=root)
+    if comm.rank != root:
+        array = numpy.empty(shape, dtype=dtype)
+    comm.Bcast(array, root=root)
+    return array
+
+
+def get_leader_comm(comm, shared_comm):
+    """Get communicator spanning the node leaders (rank 0 of each node).
+
+    Parameters
+    ----------
+    comm : `mpi4py.MPI.Comm`
+        Global MPI communicator.
+    shared_comm : `mpi4py.MPI.Comm`
+        Intra-node communicator (see get_shared_comm).
+
+    Returns
+    -------
+    leader_comm : `mpi4py.MPI.Comm`
+        Communicator between node leaders, MPI.COMM_NULL on other ranks.
+    """
+    is_leader = shared_comm.rank == 0
+    return comm.Split(0 if is_leader else MPI.UNDEFINED, comm.rank)
+
+
+def bcast_shared_array(comm, shared_comm, array, leader_comm=None):
+    """Broadcast numpy array from rank 0 into node shared memory.
+
+    Only one copy of the array is held per node. Rank 0 of comm must also be
+    rank 0 of its node's shared communicator. If shared memory is not
+    available every rank receives its own copy.
+
+    Parameters
+    ----------
+    comm : `mpi4py.MPI.Comm`
+        Global MPI communicator.
+    shared_comm : `mpi4py.MPI.Comm`
+        Intra-node communicator (see get_shared_comm).
+    array : :class:`numpy.ndarray`
+        Array to broadcast. Only referenced on rank 0.
+    leader_comm : `mpi4py.MPI.Comm`
+        Communicator between node leaders (see get_leader_comm). Pass one in
+        when broadcasting several arrays. Default: created for this call.
+
+    Returns
+    -------
+    array : :class:`numpy.ndarray`
+        Array backed by node shared memory.
+    """
+    if shared_comm is None:
+        return bcast_array(comm, array)
+    if comm.rank == 0:
+        assert shared_comm.rank == 0, "rank 0 must lead its node"
+        meta = (array.shape, array.dtype.str)
+    else:
+        meta = None
+    shape, dtype = comm.bcast(meta, root=0)
+    shared = get_shared_array(shared_comm, shape, dtype)
+    # get_shared_array falls back to a private array if shared memory windows
+    # are unavailable, whereas window backed arrays don't own their data.
+    shared_mem = not shared.flags.owndata
+    free_leader_comm = leader_comm is None
+    if free_leader_comm:
+        leader_comm = get_leader_comm(comm, shared_comm)
+    if shared_comm.rank == 0:
+        if comm.rank == 0:
+            shared[:] = array
+        leader_comm.Bcast(shared, root=0)
+        if free_leader_comm:
+            leader_comm.Free()
+    if not shared_mem:
+        # Each rank holds a private array so the node leader has to send it on.
+        shared_comm.Bcast(shared, root=0)
+    shared_comm.Barrier()
+    return shared
+
+
 def get_shared_comm(comm, verbose=False):
     try:
         return comm.Split_type(MPI.COMM_TYPE_SHARED)
@@ -3,23 +3,6 @@ cimport numpy
 
 numpy.import_array()
 
-def pack_cholesky(
-        long[:] idx_i,
-        long[:] idx_j,
-        double[:,:] Lchol_packed,
-        double[:,:,:] Lchol):
-
-    cdef long i, x
-    cdef long nbsf, nut, nchol
-    nchol = Lchol.shape[2]
-    nbsf = Lchol.shape[0]
-    nut = nbsf *(nbsf+1)//2
-
-    for i in range(nut):
-        for x in range(nchol):
-            Lchol_packed[i,x] = Lchol[idx_i[i],idx_j[i],x]
-    return
-
 def unpack_VHS(
         long[:] idx_i,
         long[:] idx_j,
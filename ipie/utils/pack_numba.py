@@ -1,5 +1,5 @@
 import numpy
-from numba import jit
+from numba import jit, prange
 
 
 @jit(nopython=True, fastmath=True)
@@ -14,3 +14,19 @@ def unpack_VHS_batch(idx_i, idx_j, VHS_packed, VHS):
             VHS[iw, idx_j[i], idx_i[i]] = VHS_packed[iw, i]
 
     return
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def pack_cholesky(idx_i, idx_j, Lchol_packed, Lchol):
+    # Lchol is (nbsf, nbsf, nchol) and assumed C contiguous so the inner loop
+    # over cholesky index is unit stride.
+    nut = len(idx_i)
+    nchol = Lchol.shape[2]
+
+    for i in prange(nut):
+        ii = idx_i[i]
+        jj = idx_j[i]
+        for x in range(nchol):
+            Lchol_packed[i, x] = Lchol[ii, jj, x]
+
+    return
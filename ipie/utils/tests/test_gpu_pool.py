@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from ipie.utils.gpu_pool import _pool, free_scratch, get_scratch
+
+
+@pytest.mark.unit
+def test_get_scratch():
+    buff = get_scratch((10, 4), np.complex128)
+    assert buff.shape == (10, 4)
+    assert buff.dtype == np.complex128
+    assert np.shares_memory(get_scratch((10, 4), np.complex128), buff)
+    assert not np.shares_memory(get_scratch((10, 4), np.float64), buff)
+    # Smaller requests are served from the existing buffer.
+    small = get_scratch((3, 2), np.complex128)
+    assert small.shape == (3, 2)
+    assert np.shares_memory(small, buff)
+    # Larger requests replace it so only one buffer is held per dtype.
+    large = get_scratch((20, 4), np.complex128)
+    assert not np.shares_memory(large, buff)
+    assert len(_pool) == 2
+    free_scratch(np.float64)
+    assert len(_pool) == 1
+    free_scratch()
+    assert get_scratch((10, 4), np.complex128) is not buff
+    free_scratch()
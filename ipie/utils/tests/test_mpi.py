@@ -0,0 +1,98 @@
+import copy
+
+import numpy
+import pytest
+from mpi4py import MPI
+
+import ipie.utils.mpi
+from ipie.utils.mpi import (MPIHandler, bcast_array, bcast_shared_array,
+                            get_leader_comm, get_mpi_handler, get_shared_comm)
+
+
+@pytest.mark.unit
+def test_get_mpi_handler_cached():
+    comm = MPI.COMM_WORLD
+    handler = get_mpi_handler(comm)
+    assert get_mpi_handler(comm) is handler
+    assert get_mpi_handler(comm, nmembers=1) is handler
+    assert handler.scomm.Get_size() == 1
+    if comm.size % 2 == 0:
+        pair = get_mpi_handler(comm, nmembers=2)
+        assert pair is not handler
+        assert pair.nmembers == 2
+
+
+@pytest.mark.unit
+def test_get_mpi_handler_freed_comm():
+    comm = MPI.COMM_WORLD.Dup()
+    handler = get_mpi_handler(comm)
+    comm.Free()
+    # A new communicator may be given the freed communicator's handle.
+    comm = MPI.COMM_WORLD.Dup()
+    fresh = get_mpi_handler(comm)
+    assert fresh is not handler
+    assert fresh.comm is comm
+    comm.Free()
+
+
+@pytest.mark.unit
+def test_mpi_handler_plain_class():
+    comm = MPI.COMM_WORLD
+    handler = MPIHandler(comm)
+    # Direct construction always builds a new handler.
+    assert MPIHandler(comm) is not handler
+    clone = copy.copy(handler)
+    assert clone is not handler
+    assert clone.scomm is handler.scomm
+
+
+@pytest.mark.unit
+def test_bcast_array():
+    comm = MPI.COMM_WORLD
+    ref = numpy.arange(12, dtype=numpy.complex128).reshape(3, 4) * 1j
+    array = bcast_array(comm, ref if comm.rank == 0 else None)
+    assert array.dtype == numpy.complex128
+    assert numpy.array_equal(array, ref)
+    ints = bcast_array(comm, numpy.arange(5) if comm.rank == 0 else None)
+    assert numpy.array_equal(ints, numpy.arange(5))
+
+
+def _bcast_shared_test_array(comm, shared_comm, leader_comm=None):
+    if comm.rank == 0:
+        array = numpy.arange(12, dtype=numpy.complex128).reshape(3, 4) * 1j
+    else:
+        array = None
+    shared = bcast_shared_array(comm, shared_comm, array, leader_comm)
+    assert shared.shape == (3, 4)
+    assert shared.dtype == numpy.complex128
+    ref = numpy.arange(12, dtype=numpy.complex128).reshape(3, 4) * 1j
+    assert numpy.array_equal(shared, ref)
+
+
+@pytest.mark.unit
+def test_bcast_shared_array():
+    comm = MPI.COMM_WORLD
+    shared_comm = get_shared_comm(comm)
+    _bcast_shared_test_array(comm, shared_comm)
+    # Reuse a single leader communicator across several arrays.
+    leader_comm = get_leader_comm(comm, shared_comm)
+    assert (leader_comm != MPI.COMM_NULL) == (shared_comm.rank == 0)
+    for i in range(2):
+        _bcast_shared_test_array(comm, shared_comm, leader_comm)
+    if leader_comm != MPI.COMM_NULL:
+        leader_comm.Free()
+    shared_comm.Free()
+
+
+@pytest.mark.unit
+def test_bcast_shared_array_no_shared_mem(monkeypatch):
+    # Emulate get_shared_array falling back to private arrays.
+    monkeypatch.setattr(
+        ipie.utils.mpi,
+        "get_shared_array",
+        lambda comm, shape, dtype: numpy.zeros(shape, dtype=dtype),
+    )
+    comm = MPI.COMM_WORLD
+    shared_comm = get_shared_comm(comm)
+    _bcast_shared_test_array(comm, shared_comm)
+    shared_comm.Free()
@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+
+from ipie.utils.pack_numba import pack_cholesky
+
+
+@pytest.mark.unit
+def test_pack_cholesky():
+    nmo = 10
+    nchol = 23
+    chol = np.random.random((nmo, nmo, nchol))
+    idx = np.triu_indices(nmo)
+    chol_packed = np.zeros((nmo * (nmo + 1) // 2, nchol), dtype=chol.dtype)
+    pack_cholesky(idx[0], idx[1], chol_packed, chol)
+    assert np.allclose(chol_packed, chol[idx[0], idx[1], :])
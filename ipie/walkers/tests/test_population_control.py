@@ -16,7 +16,7 @@ from ipie.trial_wavefunction.multi_slater import MultiSlater
 from ipie.trial_wavefunction.utils import get_trial_wavefunction
 from ipie.utils.io import get_input_value
 from ipie.utils.misc import dotdict
-from ipie.utils.mpi import MPIHandler, get_shared_comm
+from ipie.utils.mpi import get_mpi_handler, get_shared_comm
 from ipie.utils.testing import (generate_hamiltonian, get_random_nomsd,
                                 get_random_phmsd)
 from ipie.walkers.single_det_batch import SingleDetWalkerBatch
@@ -33,7 +33,7 @@ def test_pair_branch_batch():
     numpy.random.seed(7)
     comm = MPI.COMM_WORLD
 
-    mpi_handler = MPIHandler(comm)
+    mpi_handler = get_mpi_handler(comm)
 
     nelec = (5, 5)
     nwalkers = 10
@@ -114,7 +114,7 @@ def test_comb_batch():
     numpy.random.seed(7)
     comm = MPI.COMM_WORLD
 
-    mpi_handler = MPIHandler(comm)
+    mpi_handler = get_mpi_handler(comm)
 
     nelec = (5, 5)
     nwalkers = 10
@@ -192,7 +192,7 @@ def test_stochastic_reconfiguration_batch():
     numpy.random.seed(7)
     comm = MPI.COMM_WORLD
 
-    mpi_handler = MPIHandler(comm)
+    mpi_handler = get_mpi_handler(comm)
 
     nelec = (5, 5)
     nwalkers = 10
@@ -49,6 +49,8 @@ class WalkerBatch(object):
         self.ndown = system.ndown
         self.total_weight = 0.0
         self.mpi_handler = mpi_handler
+        # CUDA streams for reorthogonalisation, created on first use.
+        self._qr_streams = None
 
         self.rhf = walker_opts.get("rhf", False)
 
@@ -447,15 +449,37 @@ class WalkerBatch(object):
         ----------
         """
         assert config.get_option('use_gpu')
-        (self.phia, Rup) = qr(self.phia, mode=qr_mode)
-        Rup_diag = xp.einsum("wii->wi",Rup)
-        log_det = xp.einsum("wi->w", xp.log(abs(Rup_diag)))
         if self.ndown > 0 and not self.rhf:
-            (self.phib, Rdn) = qr(self.phib, mode=qr_mode)
-            Rdn_diag = xp.einsum("wii->wi",Rdn)
-            log_det += xp.einsum("wi->w", xp.log(abs(Rdn_diag)))
-        elif self.ndown > 0 and self.rhf:
-            log_det *= 2.0
+            # The alpha and beta factorisations are independent so run them
+            # concurrently on their own streams once the work queued on the
+            # current stream (i.e. propagation) has completed.
+            if self._qr_streams is None:
+                self._qr_streams = (
+                        xp.cuda.Stream(non_blocking=True),
+                        xp.cuda.Stream(non_blocking=True),
+                        )
+            stream_up, stream_dn = self._qr_streams
+            current = xp.cuda.get_current_stream()
+            propagated = current.record()
+            stream_up.wait_event(propagated)
+            stream_dn.wait_event(propagated)
+            with stream_up:
+                (self.phia, Rup) = qr(self.phia, mode=qr_mode)
+                Rup_diag = xp.einsum("wii->wi",Rup)
+                log_det = xp.einsum("wi->w", xp.log(abs(Rup_diag)))
+            with stream_dn:
+                (self.phib, Rdn) = qr(self.phib, mode=qr_mode)
+                Rdn_diag = xp.einsum("wii->wi",Rdn)
+                log_det_dn = xp.einsum("wi->w", xp.log(abs(Rdn_diag)))
+            current.wait_event(stream_up.record())
+            current.wait_event(stream_dn.record())
+            log_det += log_det_dn
+        else:
+            (self.phia, Rup) = qr(self.phia, mode=qr_mode)
+            Rup_diag = xp.einsum("wii->wi",Rup)
+            log_det = xp.einsum("wi->w", xp.log(abs(Rup_diag)))
+            if self.ndown > 0 and self.rhf:
+                log_det *= 2.0
 
         self.detR = xp.exp(log_det - self.detR_shift)
         self.ovlp = self.ovlp / self.detR
@@ -5,7 +5,8 @@ import cupy
 import numpy
 from numba import cuda, vectorize
 
-from ipie.utils.pack import pack_cholesky, pack_cholesky_fast, unpack_VHS_batch
+from ipie.utils.pack import pack_cholesky_fast, unpack_VHS_batch
+from ipie.utils.pack_numba import pack_cholesky
 
 
 @cuda.jit('void(int32[:],int32[:],complex128[:,:],complex128[:,:,:])',device=False)